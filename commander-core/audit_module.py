@@ -1,12 +1,17 @@
 import os
 import requests
 import logging
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta, timezone
-from dotenv import load_dotenv
+from env import ensure_env
 
-load_dotenv()
+ensure_env()
 logger = logging.getLogger(__name__)
 
+# Long-lived HTTP session so repeated GitHub API calls reuse the keep-alive connection
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
 class OvernightAudit:
     """
     Acts as the Strategic Tech Lead tracking the CEO's progression.
@@ -32,7 +37,7 @@ class OvernightAudit:
             headers["Authorization"] = f"token {self.github_token}"
 
         try:
-            response = requests.get(url, headers=headers)
+            response = _HTTP.get(url, headers=headers, timeout=30)
             response.raise_for_status()
             commits = response.json()
             
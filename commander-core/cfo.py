@@ -1,8 +1,19 @@
 import os
+import time
+import collections
 from typing import Dict, Any
-from dotenv import load_dotenv
+from env import ensure_env
 
-load_dotenv()
+ensure_env()
+
+# Per-token (input, output) USD rates, precomputed once at import.
+# Placeholder pricing (in reality, LiteLLM handles this or we maintain a pricing map)
+_PRICING = {
+    "gpt-4o": (0.005 / 1000, 0.015 / 1000),
+    "deepseek-coder": (0.00014 / 1000, 0.00028 / 1000),
+    "llama3": (0.0, 0.0), # Local model = $0
+}
+_FALLBACK_PRICING = (0.01 / 1000, 0.03 / 1000) # Fallback safe rates
 
 # Exception for exceeding financial caps
 class TokenLimitExceeded(Exception):
@@ -19,21 +30,48 @@ class CFOController:
         self.max_daily_spend = float(os.getenv("MAX_DAILY_API_SPEND_USD", "2.00"))
         self.current_daily_spend = 0.0
         
+        # Burst protection: rolling 60s window of (timestamp, cost) entries
+        self.max_per_minute = float(os.getenv("MAX_BURST_SPEND_USD", "0.50"))
+        self._recent = collections.deque()
+        
         # Stripe integration placeholders
         self.stripe_secret_key = os.getenv("STRIPE_SECRET_KEY")
         
     def add_cost(self, cost_usd: float) -> None:
         """
-        Adds to the daily spend and checks against the circuit breaker.
+        Adds to the daily spend and checks against the daily and 60s burst circuit breakers.
+        Raises TokenLimitExceeded if the limit is breached.
+        """
+        self.add_cost_batch([cost_usd])
+
+    def add_cost_batch(self, costs: list[float]) -> None:
+        """
+        Books several USD costs at once, e.g. every LLM call of one agent turn,
+        running the circuit breaker checks a single time for the whole batch.
         Raises TokenLimitExceeded if the limit is breached.
         """
-        self.current_daily_spend += cost_usd
+        if not costs:
+            return
+        batch_total = sum(costs)
+        self.current_daily_spend += batch_total
         if self.current_daily_spend > self.max_daily_spend:
             # Raise an alarm. In reality, we'd log this and send a Telegram alert before crashing out.
             raise TokenLimitExceeded(
                 f"CIRCUIT BREAKER SECURE: Daily spend limit of ${self.max_daily_spend:.2f} exceeded. "
                 f"Current spend: ${self.current_daily_spend:.2f}"
             )
+        
+        # Rolling 60s window catches rapid bursts long before the daily cap is hit
+        now = time.monotonic()
+        self._recent.append((now, batch_total))
+        while now - self._recent[0][0] > 60:
+            self._recent.popleft()
+        burst_spend = sum(cost for _, cost in self._recent)
+        if burst_spend > self.max_per_minute:
+            raise TokenLimitExceeded(
+                f"CIRCUIT BREAKER SECURE: Burst spend limit of ${self.max_per_minute:.2f}/min exceeded. "
+                f"Spend in the last 60s: ${burst_spend:.2f}"
+            )
 
     def get_financial_summary(self) -> str:
         """
@@ -50,17 +88,8 @@ class CFOController:
         Estimates cost based on token counts and model pricing. 
         Note: True cost should ideally be parsed from the LiteLLM response directly.
         """
-        # Placeholder pricing logic (in reality, LiteLLM handles this or we maintain a pricing map)
-        pricing_map = {
-            "gpt-4o": {"input": 0.005 / 1000, "output": 0.015 / 1000},
-            "deepseek-coder": {"input": 0.00014 / 1000, "output": 0.00028 / 1000},
-            "llama3": {"input": 0.0, "output": 0.0}, # Local model = $0
-        }
-        
-        rates = pricing_map.get(model, {"input": 0.01 / 1000, "output": 0.03 / 1000}) # Fallback safe rates
-        cost = (prompt_tokens * rates["input"]) + (completion_tokens * rates["output"])
-        
-        return cost
+        inp, out = _PRICING.get(model, _FALLBACK_PRICING)
+        return (prompt_tokens * inp) + (completion_tokens * out)
 
 # Global singleton
 cfo = CFOController()
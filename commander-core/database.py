@@ -1,9 +1,9 @@
 import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
-from dotenv import load_dotenv
+from env import ensure_env
 
-load_dotenv()
+ensure_env()
 
 # 1. Fetch the Railway PostgreSQL URL, or fallback to local SQLite for dev
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./memory/sintari.db")
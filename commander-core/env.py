@@ -0,0 +1,17 @@
+"""Once-only .env loader shared by every Commander module.
+
+Each module used to call `load_dotenv()` at import time, re-parsing the .env
+file on every import. `ensure_env()` parses it exactly once per process.
+"""
+
+from dotenv import load_dotenv
+
+_LOADED = False
+
+
+def ensure_env() -> None:
+    """Loads the .env file into os.environ the first time it is called."""
+    global _LOADED
+    if not _LOADED:
+        load_dotenv()
+        _LOADED = True
@@ -2,9 +2,15 @@ import os
 import sys
 import time
 import uuid
+import logging
 import boto3
 from memory_module import memory_bank
 
+logger = logging.getLogger(__name__)
+
+# Shared session so credential resolution and endpoint data are loaded once per process
+_SESSION = boto3.Session()
+
 def archive_to_r2(content: str, source_url: str, metadata: dict = None) -> bool:
     """Saves raw data (e.g., HTML) to Cloudflare R2 for auditability ("Zero Hallucination")."""
     try:
@@ -13,13 +19,13 @@ def archive_to_r2(content: str, source_url: str, metadata: dict = None) -> bool:
         bucket_name = os.getenv("CLOUDFLARE_R2_BUCKET_NAME", "hype-engine-media")
         
         if not r2_access_key or not r2_secret_key:
-            print("R2 credentials not found. Skipping archive.")
+            logger.warning("R2 credentials not found. Skipping archive.")
             return False
 
         account_id = os.getenv("CLOUDFLARE_ACCOUNT_ID", "")
         endpoint_url = f"https://{account_id}.r2.cloudflarestorage.com" if account_id else None
 
-        s3 = boto3.client(
+        s3 = _SESSION.client(
             's3',
             endpoint_url=endpoint_url,
             aws_access_key_id=r2_access_key,
@@ -35,10 +41,10 @@ def archive_to_r2(content: str, source_url: str, metadata: dict = None) -> bool:
             Body=content.encode('utf-8'),
             Metadata=metadata or {'source': source_url}
         )
-        print(f"Archived raw content to R2: {filename}")
+        logger.info("Archived raw content to R2: %s", filename)
         return True
     except Exception as e:
-        print(f"Failed to archive to R2: {e}")
+        logger.error("Failed to archive to R2: %s", e)
         return False
 
 def ingest_markdown(filepath: str):
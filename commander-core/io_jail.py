@@ -15,18 +15,22 @@ class IOJail:
             # In a real scenario, this might be created. Erroring for strict zero-trust initialization
             raise ValueError(f"CRITICAL: Allowed directory {self.allowed_directory} does not exist.")
 
+        # String forms of the jail root for the prefix check in _verify_path
+        self._allowed_str_exact = str(self.allowed_directory)
+        self._allowed_str = os.path.join(self._allowed_str_exact, "")
+
     def _verify_path(self, target_path: Union[str, Path]) -> Path:
         """
         Resolves the target path and verifies it is a strict subdirectory of the allowed directory.
         Returns the resolved Path object if safe. Raises SecurityViolationError otherwise.
         """
         # Resolve resolves symlinks and standardizes path to absolute
+        # Never cached: a path inside the jail can be swapped for a symlink pointing outside it
         resolved_path = Path(target_path).resolve()
         
-        # Check if the resolved path starts with the allowed directory path
-        try:
-            resolved_path.relative_to(self.allowed_directory)
-        except ValueError:
+        # The resolved path must be the jail root itself or sit strictly below it
+        rp = str(resolved_path)
+        if rp != self._allowed_str_exact and not rp.startswith(self._allowed_str):
             raise SecurityViolationError(
                 f"SECURITY VIOLATION: Attempted access to '{resolved_path}' outside of jail '{self.allowed_directory}'"
             )
@@ -64,14 +68,17 @@ class IOJail:
         if not safe_path.is_dir():
             raise NotADirectoryError(f"Not a directory: {safe_path}")
             
-        return [str(p.relative_to(self.allowed_directory)) for p in safe_path.iterdir()]
+        # DirEntry.path already carries the jail root prefix; slice it off instead of relative_to
+        prefix_len = len(self._allowed_str)
+        with os.scandir(safe_path) as entries:
+            return [entry.path[prefix_len:] for entry in entries]
 
 # Singleton instance initialized from environment variables
 # In practice this is imported and used, so initialization happens at module load
 import os
-from dotenv import load_dotenv
+from env import ensure_env
 
-load_dotenv()
+ensure_env()
 ALLOWED_MISSIONS_DIR = os.getenv("ALLOWED_MISSIONS_DIR")
 
 # Fallback for dev/railway if not set. Use current working directory.
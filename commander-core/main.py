@@ -1,14 +1,14 @@
 import os
 import asyncio
 import logging
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from env import ensure_env
+
+ensure_env()
 
 from reporter import start_telegram_polling, reporter_instance
 from partner_bot import start_partner_polling, send_partner_morning_briefing, send_welcome_to_hanni
 from router import router
-from pipeline import pipeline
-
-load_dotenv()
 
 # Setup Logging
 logging.basicConfig(
@@ -33,7 +33,7 @@ async def watchdog_heartbeat():
     if action_required:
         logger.info("Watchdog detected anomaly or required work! Waking up Cortex...")
         
-        cortex_decision = router.ask_cortex(
+        cortex_decision = await router.ask_cortex_async(
             system_prompt="You are the COO evaluating a system prompt from the watchdog. What is the next play?",
             user_prompt=f"Watchdog Context: {simulated_context}"
         )
@@ -131,6 +131,12 @@ async def github_code_review_job():
 async def main():
     logger.info("Booting Commander Core (CEO Mode)...")
     
+    # Size the default executor (asyncio.to_thread and friends) explicitly. Cortex calls are awaited on the loop;
+    # router.CORTEX_POOL only backs the sync wrappers such as audit_module.generate_audit_report.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=int(os.getenv("THREAD_POOL_SIZE", "32")))
+    )
+    
     # 1. Start the Proactive Scheduler
     from scheduler_module import commander_scheduler
     
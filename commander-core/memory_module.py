@@ -11,13 +11,14 @@ Strategy:
 import os
 import json
 import logging
+import orjson
 import uuid
 import numpy as np
 from datetime import datetime
 from litellm import embedding
-from dotenv import load_dotenv
+from env import ensure_env
 
-load_dotenv()
+ensure_env()
 logger = logging.getLogger(__name__)
 
 EMBEDDING_MODEL = "text-embedding-3-small"
@@ -116,7 +117,7 @@ class MemoryBank:
                         "text": text,
                         "category": category,
                         "ts": datetime.utcnow().isoformat(),
-                        "embedding": json.dumps(vector)
+                        "embedding": orjson.dumps(vector).decode()
                     }
                 )
             return True, ""
@@ -152,7 +153,7 @@ class MemoryBank:
                 if not mem_emb_json:
                     continue
                 try:
-                    mem_vec = json.loads(mem_emb_json)
+                    mem_vec = orjson.loads(mem_emb_json)
                     score = self._cosine_similarity(query_vec, mem_vec)
                     scored.append({
                         "text": mem_text,
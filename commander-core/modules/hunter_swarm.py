@@ -31,6 +31,8 @@ class HunterSwarm:
         self.r2_secret_key = os.getenv("CLOUDFLARE_R2_SECRET_KEY")
         self.account_id = os.getenv("CLOUDFLARE_ACCOUNT_ID")
         self.bucket_name = os.getenv("CLOUDFLARE_R2_BUCKET_NAME", "sintari-data-lake")
+        self._endpoint_url = f"https://{self.account_id}.r2.cloudflarestorage.com"  # Immutable after init
+        self._session = get_session()  # Reused across uploads instead of one per file
         
         self.visited_urls: Set[str] = set()
 
@@ -49,14 +51,11 @@ class HunterSwarm:
                 f.write(content)
             return True
 
-        endpoint_url = f"https://{self.account_id}.r2.cloudflarestorage.com"
-        session = get_session()
-        
         try:
-            async with session.create_client(
+            async with self._session.create_client(
                 's3',
                 region_name='auto',
-                endpoint_url=endpoint_url,
+                endpoint_url=self._endpoint_url,
                 aws_access_key_id=self.r2_access_key,
                 aws_secret_access_key=self.r2_secret_key
             ) as client:
@@ -20,23 +20,34 @@ Usage:
 import os
 import json
 import logging
+import orjson
 import uuid
 import numpy as np
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
-from dotenv import load_dotenv
+from env import ensure_env
 from litellm import embedding
 from sqlalchemy import text as sql_text
 
-load_dotenv()
+ensure_env()
 logger = logging.getLogger("IntelIngest")
 logger.setLevel(logging.INFO)
 
 EMBEDDING_MODEL = "text-embedding-3-small"
 EMBEDDING_DIMS = 1536
 
+# Rows are buffered and inserted with one executemany per batch
+INSERT_BATCH_SIZE = 10
+_INSERT_INTEL_SQL = sql_text("""
+    INSERT INTO intelligence_data (id, source_url, mission_id, scraped_at, content, embedding, raw_data)
+    VALUES (:id, :source_url, :mission_id, :scraped_at, :content, :embedding, CAST(:raw_data AS jsonb))
+""")
+
+# Set once ensure_schema() has succeeded so later ingests skip the DDL round-trips
+_SCHEMA_READY = False
+
 
 def _get_engine():
     """Lazily imports the shared SQLAlchemy engine from database.py.
@@ -54,11 +65,16 @@ def _get_engine():
 def ensure_schema():
     """Creates the intelligence_data table if it doesn't exist.
 
-    This is idempotent — safe to call on every startup.
+    This is idempotent — safe to call on every startup. After the first
+    success in a process the DDL is skipped entirely.
 
     Returns:
         bool: True if schema was ensured successfully, False otherwise.
     """
+    global _SCHEMA_READY
+    if _SCHEMA_READY:
+        return True
+
     engine = _get_engine()
     try:
         with engine.begin() as conn:
@@ -87,6 +103,7 @@ def ensure_schema():
             """))
 
         logger.info("Schema ensured: intelligence_data table + JSONB index ready.")
+        _SCHEMA_READY = True
         return True
     except Exception as e:
         logger.error(f"Schema creation failed: {e}")
@@ -179,11 +196,41 @@ def extract_content(json_data: dict, source_file: str = "") -> str:
     return "\n".join(parts)
 
 
+def _flush_rows(engine, rows: list[dict], stats: dict) -> None:
+    """Inserts all buffered rows in a single transaction and clears the buffer.
+
+    Args:
+        engine: The shared SQLAlchemy engine.
+        rows: Buffered parameter dicts for the intelligence_data INSERT.
+        stats: The ingest statistics dict, updated in place.
+    """
+    if not rows:
+        return
+    try:
+        with engine.begin() as conn:
+            conn.execute(_INSERT_INTEL_SQL, rows)
+        stats["ingested"] += len(rows)
+        logger.info(f"Flushed {len(rows)} rows to intelligence_data.")
+    except Exception as e:
+        # One bad row aborts the whole transaction; retry row by row so only that row is lost
+        logger.warning(f"Batch insert of {len(rows)} rows failed, retrying individually: {e}")
+        for row in rows:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(_INSERT_INTEL_SQL, row)
+                stats["ingested"] += 1
+            except Exception as row_error:
+                logger.error(f"Insert failed for {row['source_url']}: {row_error}")
+                stats["errors"] += 1
+    rows.clear()
+
+
 def ingest_directory(intel_dir: str, mission_id: str = "unknown") -> dict:
     """Ingests all JSON files from a directory into Postgres.
 
     Walks the directory, parses each .json file, extracts content, generates
-    embeddings, and inserts rows into the intelligence_data table.
+    embeddings, and inserts rows into the intelligence_data table in batches
+    of INSERT_BATCH_SIZE.
 
     Args:
         intel_dir: Absolute path to the directory containing JSON files.
@@ -205,6 +252,8 @@ def ingest_directory(intel_dir: str, mission_id: str = "unknown") -> dict:
 
     logger.info(f"Starting ingest of {len(json_files)} JSON files from {intel_dir} (mission: {mission_id})")
 
+    pending: list[dict] = []
+
     for json_file in json_files:
         try:
             with open(json_file, "r", encoding="utf-8") as f:
@@ -238,26 +287,20 @@ def ingest_directory(intel_dir: str, mission_id: str = "unknown") -> dict:
             if len(raw_json_str) > 500_000:
                 raw_json_str = json.dumps({"_truncated": True, "_original_size": len(raw_json_str)})
 
-            # Insert into Postgres
-            with engine.begin() as conn:
-                conn.execute(
-                    sql_text("""
-                        INSERT INTO intelligence_data (id, source_url, mission_id, scraped_at, content, embedding, raw_data)
-                        VALUES (:id, :source_url, :mission_id, :scraped_at, :content, :embedding, CAST(:raw_data AS jsonb))
-                    """),
-                    {
-                        "id": str(uuid.uuid4()),
-                        "source_url": json_file.name,
-                        "mission_id": mission_id,
-                        "scraped_at": datetime.now(timezone.utc).isoformat(),
-                        "content": content,
-                        "embedding": json.dumps(emb_vector),
-                        "raw_data": raw_json_str,
-                    }
-                )
-
-            stats["ingested"] += 1
-            logger.info(f"Ingested: {json_file.name} ({len(content)} chars)")
+            # Buffer the row; inserts are flushed to Postgres in batches
+            pending.append({
+                "id": str(uuid.uuid4()),
+                "source_url": json_file.name,
+                "mission_id": mission_id,
+                "scraped_at": datetime.now(timezone.utc).isoformat(),
+                "content": content.replace("\u0000", ""),
+                "embedding": orjson.dumps(emb_vector).decode(),
+                "raw_data": raw_json_str,
+            })
+            logger.info(f"Prepared: {json_file.name} ({len(content)} chars)")
+
+            if len(pending) >= INSERT_BATCH_SIZE:
+                _flush_rows(engine, pending, stats)
 
         except json.JSONDecodeError:
             logger.warning(f"Skipping non-JSON file: {json_file.name}")
@@ -266,6 +309,8 @@ def ingest_directory(intel_dir: str, mission_id: str = "unknown") -> dict:
             logger.error(f"Failed to ingest {json_file.name}: {e}")
             stats["errors"] += 1
 
+    _flush_rows(engine, pending, stats)
+
     logger.info(f"Ingest complete: {stats}")
     return stats
 
@@ -314,7 +359,7 @@ def search_intel(
             if not emb_json:
                 continue
             try:
-                row_vec = json.loads(emb_json)
+                row_vec = orjson.loads(emb_json)
                 score = _cosine_similarity(query_vec, row_vec)
                 scored.append({
                     "id": str(row_id),
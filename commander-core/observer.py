@@ -3,6 +3,9 @@ from pathlib import Path
 from tree_sitter import Language, Parser
 from io_jail import read_file, list_files
 
+# Source file suffixes picked up by scan_active_mission (single C-level endswith check)
+_SUFFIXES = ('.py', '.ts', '.tsx')
+
 # Note: Tree-sitter setup in real environments requires compiling the shared objects (.so / .dll).
 # We are creating a mock wrapper that assumes the languages are available.
 
@@ -50,7 +53,7 @@ class DeterministicObserver:
         try:
             # We use the IO jail to strictly list files in the target subfolder
             all_files = list_files(mission_name)
-            return [f for f in all_files if f.endswith('.py') or f.endswith('.ts') or f.endswith('.tsx')]
+            return [f for f in all_files if f.endswith(_SUFFIXES)]
         except Exception as e:
             print(f"Error scanning mission {mission_name}: {e}")
             return []
@@ -14,17 +14,17 @@ eller andra känsliga Commander-verktyg.
 import os
 import re
 import uuid
-import asyncio
 import logging
+import collections
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
 from aiogram import Bot, Dispatcher, types
 from aiogram.filters import Command
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from dotenv import load_dotenv
+from env import ensure_env
 
-load_dotenv()
+ensure_env()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("PartnerBot")
@@ -677,8 +677,9 @@ async def partner_chat_handler(message: types.Message):
     try:
         from router import router
 
+        # Fixed-capacity window: the oldest turns fall off on append, so the context sent to the swarm never grows
         if user_id not in partner_sessions:
-            partner_sessions[user_id] = []
+            partner_sessions[user_id] = collections.deque(maxlen=20)
         history = partner_sessions[user_id]
 
         # Enrich with calendar context
@@ -686,19 +687,15 @@ async def partner_chat_handler(message: types.Message):
         hanni_cal = get_hanni_schedule(days_ahead=3)
         context = f"\n[KONTEXT: {jimmy_cal}\n{hanni_cal}]"
 
-        def ask_ai():
-            return router.ask_cortex(
-                user_prompt=user_text + context,
-                history=history,
-                user_name=user_name,
-                system_prompt=PARTNER_SYSTEM_PROMPT
-            )
-
-        reply = await asyncio.to_thread(ask_ai)
+        reply = await router.ask_cortex_async(
+            user_prompt=user_text + context,
+            history=list(history),
+            user_name=user_name,
+            system_prompt=PARTNER_SYSTEM_PROMPT
+        )
 
         history.append({"role": "user", "content": user_text})
         history.append({"role": "assistant", "content": reply})
-        partner_sessions[user_id] = history[-20:]
 
         await message.answer(reply, parse_mode="Markdown")
     except Exception as e:
@@ -821,4 +818,4 @@ async def send_welcome_to_hanni():
 async def start_partner_polling():
     """Starts the Telegram polling loop for the Partner Bot."""
     logger.info("Starting Telegram polling for Sintari Partner Bot (Hanni)...")
-    await partner_dp.start_polling(partner_bot)
+    await partner_dp.start_polling(partner_bot, polling_timeout=30, allowed_updates=["message", "callback_query"])
@@ -1,40 +1,54 @@
 import os
 import asyncio
 import logging
+import functools
+import collections
 from aiogram import Bot, Dispatcher, types
 from aiogram.filters import Command
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from dotenv import load_dotenv
+from env import ensure_env
 
-load_dotenv()
+ensure_env()
+
+from router import router
+from cfo import cfo
 
 # Setup logging for the Telegram bot
 logging.basicConfig(level=logging.INFO)
 
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-# Safely parse IDs as a list of strings
-AUTHORIZED_USERS = [u.strip() for u in os.getenv("TELEGRAM_AUTHORIZED_USER_ID", "123456789").split(',')]
+# Parse IDs once as ints so per-message checks compare against from_user.id directly
+AUTHORIZED_USER_IDS = tuple(int(u) for u in os.getenv("TELEGRAM_AUTHORIZED_USER_ID", "123456789").split(',') if u.strip())
 
 if not TELEGRAM_TOKEN:
     raise ValueError("CRITICAL: TELEGRAM_BOT_TOKEN environment variable is missing.")
 
-# Initialize the Bot and Dispatcher
-bot = Bot(token=TELEGRAM_TOKEN)
+@functools.cache
+def get_bot() -> Bot:
+    """
+    Returns the process-wide CEO Bot, created on first use.
+    aiogram's default AiohttpSession keeps one pooled keep-alive connector (with DNS caching) per Bot,
+    so every outbound Telegram call shares it.
+    """
+    return Bot(token=TELEGRAM_TOKEN)
+
+# Initialize the Dispatcher
 dp = Dispatcher()
 
-# Pre-defined Inline Keyboards
+# Pre-defined Inline Keyboards (built once at import; the markup is never mutated)
+_MAIN_MENU = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="🧠 Byt AI-Modell", callback_data="btn_model_swap"),
+        InlineKeyboardButton(text="❤️ Systemstatus", callback_data="btn_pulse"),
+    ],
+    [
+        InlineKeyboardButton(text="💰 Finansiell Översikt", callback_data="btn_cfo"),
+    ]
+])
+
 def get_main_menu() -> InlineKeyboardMarkup:
     """Returns the main interactive menu for CEO Mode."""
-    buttons = [
-        [
-            InlineKeyboardButton(text="🧠 Byt AI-Modell", callback_data="btn_model_swap"),
-            InlineKeyboardButton(text="❤️ Systemstatus", callback_data="btn_pulse"),
-        ],
-        [
-            InlineKeyboardButton(text="💰 Finansiell Översikt", callback_data="btn_cfo"),
-        ]
-    ]
-    return InlineKeyboardMarkup(inline_keyboard=buttons)
+    return _MAIN_MENU
 
 class Reporter:
     """
@@ -46,14 +60,14 @@ class Reporter:
 
     async def verify_user(self, message: types.Message) -> bool:
         """Verifies if the sender is the authorized CEO."""
-        if str(message.from_user.id) not in AUTHORIZED_USERS:
+        if message.from_user.id not in AUTHORIZED_USER_IDS:
             await message.reply(f"Åtkomst Nekad. Du är inte auktoriserad att ge mig order. (Ditt ID: {message.from_user.id})")
             return False
         return True
 
     async def send_morning_briefing(self, briefing_text: str):
         """Sends the daily Morning Briefing."""
-        for user in AUTHORIZED_USERS:
+        for user in AUTHORIZED_USER_IDS:
             try:
                 await self.bot.send_message(
                     chat_id=user,
@@ -65,7 +79,7 @@ class Reporter:
 
     async def send_alert(self, alert_text: str):
         """Sends an immediate proactive alert."""
-        for user in AUTHORIZED_USERS:
+        for user in AUTHORIZED_USER_IDS:
             try:
                 await self.bot.send_message(
                     chat_id=user,
@@ -83,7 +97,7 @@ class Reporter:
                 InlineKeyboardButton(text="❌ Avbryt", callback_data=f"deny_{action_id}")
             ]
         ])
-        for user in AUTHORIZED_USERS:
+        for user in AUTHORIZED_USER_IDS:
             try:
                 await self.bot.send_message(
                     chat_id=user,
@@ -94,45 +108,46 @@ class Reporter:
             except Exception as e:
                 logging.error(f"Failed to send confirmation requirement to user {user}: {e}")
 
-reporter_instance = Reporter(bot)
+reporter_instance = Reporter(get_bot())
+# Handlers receive the Reporter through aiogram's workflow data (a `reporter` parameter) instead of the global
+dp["reporter"] = reporter_instance
 
 # ==========================================
 # COMMAND HANDLERS
 # ==========================================
 
 @dp.message(Command("start", "menu"))
-async def cmd_start(message: types.Message):
-    if await reporter_instance.verify_user(message):
+async def cmd_start(message: types.Message, reporter: Reporter):
+    if await reporter.verify_user(message):
         await message.answer(
             "Välkommen Commander. Jag väntar på dina direktiv.",
             reply_markup=get_main_menu()
         )
 
 @dp.message(Command("pulse"))
-async def cmd_pulse(message: types.Message):
-    if await reporter_instance.verify_user(message):
+async def cmd_pulse(message: types.Message, reporter: Reporter):
+    if await reporter.verify_user(message):
         await message.answer("❤️ Puls: **Online och Stabil**. Alla system är aktiva.")
 
 @dp.message(Command("model"))
-async def cmd_model(message: types.Message):
-    if await reporter_instance.verify_user(message):
+async def cmd_model(message: types.Message, reporter: Reporter):
+    if await reporter.verify_user(message):
         # Placeholder for model swapping logic
         await message.answer("🔄 Swapping to alternative Cortex Model... [Feature Pending]")
 
 @dp.message(Command("review"))
-async def cmd_review(message: types.Message):
+async def cmd_review(message: types.Message, reporter: Reporter):
     """Manually triggers the Mid-Week Accountability Review."""
-    if await reporter_instance.verify_user(message):
+    if await reporter.verify_user(message):
         await message.answer("⚖️ Initierar Mid-Week Review. Validerar dina senaste pushade GitHub-commits mot din affärsplan...")
-        import routines
-        import asyncio
+        import routines  # Local import: routines imports reporter_instance from this module
         # Run asynchronously as perform_midweek_review is an async function
         await routines.perform_midweek_review()
 
 @dp.message(Command("hemma"))
-async def cmd_commute(message: types.Message):
+async def cmd_commute(message: types.Message, reporter: Reporter):
     """Sends a 'On my way home' broadcast to Hanni via her bot."""
-    if not await reporter_instance.verify_user(message):
+    if not await reporter.verify_user(message):
         return
     try:
         from partner_bot import send_message_to_hanni
@@ -149,9 +164,9 @@ async def cmd_commute(message: types.Message):
         await message.answer(f"❌ Fel: {str(e)}")
 
 @dp.message(Command("hanni"))
-async def cmd_remind_hanni(message: types.Message):
+async def cmd_remind_hanni(message: types.Message, reporter: Reporter):
     """Sends a reminder/message to Hanni. Usage: /hanni Hämta barnen kl 16"""
-    if not await reporter_instance.verify_user(message):
+    if not await reporter.verify_user(message):
         return
     
     raw_text = message.text.replace("/hanni", "", 1).strip()
@@ -176,11 +191,11 @@ async def cmd_remind_hanni(message: types.Message):
 # ==========================================
 
 @dp.message(Command("schema"))
-async def cmd_schema(message: types.Message):
+async def cmd_schema(message: types.Message, reporter: Reporter):
     """Parses a pasted work schedule deterministically and bulk-inserts into the calendar.
     Usage: /schema followed by lines like '2/3 Mån: 07:00-16:00 (optional note)'
     """
-    if not await reporter_instance.verify_user(message):
+    if not await reporter.verify_user(message):
         return
     
     import re
@@ -285,11 +300,20 @@ async def cmd_schema(message: types.Message):
 # ==========================================
 # CHAT HANDLER (Modell-Lera / Conversational Mode)
 # ==========================================
-user_sessions = {}
+# Per-user chat history, kept as an LRU so inactive users are evicted once the map is full
+MAX_CHAT_SESSIONS = 1000
+user_sessions = collections.OrderedDict()
+
+# Caps how many cortex runs execute at once so a burst of chats can't flood the LLM backend
+_CORTEX_SEM = asyncio.Semaphore(int(os.getenv("CORTEX_MAX_CONCURRENCY", "2")))
+
+# Backpressure: in-flight cortex requests per user; extra messages get a busy notice instead of queueing
+MAX_INFLIGHT_PER_USER = 2
+CORTEX_INFLIGHT: dict[int, int] = collections.defaultdict(int)
 
 @dp.message()
-async def chat_handler(message: types.Message):
-    if not await reporter_instance.verify_user(message):
+async def chat_handler(message: types.Message, reporter: Reporter):
+    if not await reporter.verify_user(message):
         return
 
     user_id = message.from_user.id
@@ -299,56 +323,84 @@ async def chat_handler(message: types.Message):
     if not user_text:
         return
 
-    # Show typing indicator
-    await bot.send_chat_action(chat_id=user_id, action="typing")
-
-    # Initialize memory if empty
-    if user_id not in user_sessions:
-        user_sessions[user_id] = []
-        
-    history = user_sessions[user_id]
+    if CORTEX_INFLIGHT[user_id] >= MAX_INFLIGHT_PER_USER:
+        await message.answer("⏳ Jag jobbar fortfarande på dina tidigare uppdrag. Vänta tills jag är klar innan du skickar fler.")
+        return
 
+    # Claim the slot before any await, so a burst of concurrent updates cannot all pass the check above
+    CORTEX_INFLIGHT[user_id] += 1
     try:
-        from router import router
-        import asyncio
+        # Show typing indicator
+        await reporter.bot.send_chat_action(chat_id=user_id, action="typing")
+
+        # Initialize memory if empty (bounded to last 20 messages to save context window)
+        if user_id in user_sessions:
+            user_sessions.move_to_end(user_id)
+        else:
+            user_sessions[user_id] = collections.deque(maxlen=20)
+            if len(user_sessions) > MAX_CHAT_SESSIONS:
+                user_sessions.popitem(last=False)
 
-        def ask_ai():
-            return router.ask_cortex(user_prompt=user_text, history=history, user_name=user_name)
+        history = user_sessions[user_id]
 
-        # Run synchronously in a thread to not block other Telegram users
-        reply = await asyncio.to_thread(ask_ai)
+        # The swarm is async end-to-end, so await it on the event loop instead of hopping to a thread
+        async with _CORTEX_SEM:
+            reply = await router.ask_cortex_async(user_prompt=user_text, history=list(history), user_name=user_name)
 
         # Update history
         history.append({"role": "user", "content": user_text})
         history.append({"role": "assistant", "content": reply})
-        
-        # Keep memory bounded to last 20 messages to save context window
-        user_sessions[user_id] = history[-20:]
 
         await message.answer(reply)
     except Exception as e:
         logging.error(f"Chat error: {e}")
         await message.answer(f"❌ Ett fel uppstod i mina kognitiva kretsar: {str(e)}")
+    finally:
+        CORTEX_INFLIGHT[user_id] -= 1
 
 # ==========================================
 # CALLBACK HANDLERS (For Inline Keyboard)
 # ==========================================
 
+# Per-chat callback queues: each chat is drained in order by its own worker task,
+# so a slow callback in one chat never holds up callbacks from another.
+CHAT_QUEUES: dict[int, asyncio.Queue] = {}
+CHAT_WORKERS: dict[int, asyncio.Task] = {}
+
 @dp.callback_query()
 async def callbacks_handlers(callback: types.CallbackQuery):
-    if str(callback.from_user.id) not in AUTHORIZED_USERS:
+    if callback.from_user.id not in AUTHORIZED_USER_IDS:
         await callback.answer("Åtkomst Nekad", show_alert=True)
         return
 
     # Acknowledge the callback to remove the "loading" state on the button
     await callback.answer()
 
+    chat_id = callback.message.chat.id if callback.message else callback.from_user.id
+    queue = CHAT_QUEUES.get(chat_id)
+    if queue is None:
+        queue = CHAT_QUEUES[chat_id] = asyncio.Queue()
+        CHAT_WORKERS[chat_id] = asyncio.create_task(_chat_callback_worker(queue))
+    queue.put_nowait(callback)
+
+async def _chat_callback_worker(queue: asyncio.Queue):
+    """Processes one chat's callbacks sequentially, preserving their order."""
+    while True:
+        callback = await queue.get()
+        try:
+            await _dispatch_callback(callback)
+        except Exception as e:
+            logging.error(f"Callback '{callback.data}' failed: {e}")
+        finally:
+            queue.task_done()
+
+async def _dispatch_callback(callback: types.CallbackQuery):
+    """Routes an inline keyboard callback to its action."""
     if callback.data == "btn_model_swap":
         await callback.message.answer("Byter AI-modeller...")
     elif callback.data == "btn_pulse":
         await callback.message.answer("❤️ Systempuls stabil.")
     elif callback.data == "btn_cfo":
-        from cfo import cfo
         summary = cfo.get_financial_summary()
         await callback.message.answer(summary)
     
@@ -364,4 +416,5 @@ async def callbacks_handlers(callback: types.CallbackQuery):
 async def start_telegram_polling():
     """Starts the Telegram polling loop. Should be run as an asyncio task."""
     logging.info("Starting Telegram polling for The Commander...")
-    await dp.start_polling(bot)
+    # Long-poll for only the update types this bot handles; everything else is never fetched or parsed
+    await dp.start_polling(get_bot(), polling_timeout=30, allowed_updates=["message", "callback_query"])
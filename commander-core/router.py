@@ -1,14 +1,40 @@
 import os
+import re
 import asyncio
+import logging
+import hashlib
+import threading
+import collections
+import concurrent.futures
+import httpx
+import orjson
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, AIMessage
 from swarm.graph import swarm_engine
 
+logger = logging.getLogger(__name__)
+
 api_router = APIRouter()
 
+# Chat-history roles -> LangChain message classes for ask_cortex_async
+_ROLE_MESSAGE_CLASSES = {"user": HumanMessage, "assistant": AIMessage}
+
+# Whole-word, case-insensitive YES (so "yesterday" doesn't count as a watchdog alarm)
+_YES_RE = re.compile(r"\byes\b", re.IGNORECASE)
+
+# In-process completion cache, only used for near-deterministic (low temperature) calls
+COMPLETION_CACHE_SIZE = 256
+DETERMINISTIC_TEMPERATURE = 0.2
+
+# Dedicated workers for blocking cortex calls, kept apart from asyncio's default executor
+CORTEX_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=int(os.getenv("CORTEX_POOL_SIZE", "2")),
+    thread_name_prefix="cortex",
+)
+
 class AskRequest(BaseModel):
     query: str
     user_id: str = "Jimmy"
@@ -50,7 +76,7 @@ async def ask_endpoint(request: AskRequest):
         )
 
     except Exception as e:
-        print(f"🔥 SWARM ERROR (API): {e}")
+        logger.exception("🔥 SWARM ERROR (API): %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 class ModelOrchestrator:
@@ -58,6 +84,50 @@ class ModelOrchestrator:
     The hybrid bridge holding legacy internal Python calls
     while forwarding all core logic to LangGraph.
     """
+    def __init__(self):
+        # One keep-alive HTTP client for LiteLLM's sync calls, so repeated watchdog/cortex
+        # round trips to the same provider reuse the TCP+TLS connection.
+        import litellm
+        self._http = httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60),
+            timeout=httpx.Timeout(600.0, connect=10.0),
+        )
+        litellm.client_session = self._http
+
+        self._cache: collections.OrderedDict[bytes, str] = collections.OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @staticmethod
+    def _cache_key(model: str, messages: list) -> bytes:
+        """Hashes model + messages into a compact cache key (non-cryptographic use)."""
+        h = hashlib.blake2b(model.encode(), digest_size=16)
+        h.update(orjson.dumps(messages, option=orjson.OPT_SORT_KEYS))
+        return h.digest()
+
+    def _cached_completion(self, model: str, messages: list, temperature: float) -> str:
+        """
+        Runs a sync LiteLLM completion and returns the reply text.
+        Replies at temperature <= DETERMINISTIC_TEMPERATURE are memoized in a bounded LRU.
+        """
+        from litellm import completion
+        cacheable = temperature <= DETERMINISTIC_TEMPERATURE
+        if cacheable:
+            key = self._cache_key(model, messages)
+            with self._cache_lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    return self._cache[key]
+
+        response = completion(model=model, messages=messages, temperature=temperature)
+        content = response.choices[0].message.content
+
+        if cacheable:
+            with self._cache_lock:
+                self._cache[key] = content
+                if len(self._cache) > COMPLETION_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return content
+
     async def ask_cortex_async(self, user_prompt: str, history: list = None, system_prompt: str = None, user_name: str = "Commander") -> str:
         """
         The new async gateway for internal Telegram/Cron jobs to reach the Swarm.
@@ -65,12 +135,11 @@ class ModelOrchestrator:
         try:
             langchain_messages = []
             if history:
-                from langchain_core.messages import AIMessage
                 for msg in history:
-                    if msg.get("role") == "user":
-                        langchain_messages.append(HumanMessage(content=msg.get("content", "")))
-                    elif msg.get("role") == "assistant":
-                        langchain_messages.append(AIMessage(content=msg.get("content", "")))
+                    # Read each role once and map straight to its message class
+                    message_cls = _ROLE_MESSAGE_CLASSES.get(msg.get("role"))
+                    if message_cls is not None:
+                        langchain_messages.append(message_cls(content=msg.get("content", "")))
                         
             langchain_messages.append(HumanMessage(content=user_prompt))
 
@@ -91,7 +160,7 @@ class ModelOrchestrator:
             last_message = final_state["messages"][-1]
             return last_message.content
         except Exception as e:
-            print(f"🔥 SWARM ERROR (Internal): {e}")
+            logger.exception("🔥 SWARM ERROR (Internal): %s", e)
             return f"System Error i Svärmen: {e}"
 
     def ask_cortex(self, user_prompt: str, history: list = None, system_prompt: str = None, user_name: str = "Commander") -> str:
@@ -101,9 +170,7 @@ class ModelOrchestrator:
         except RuntimeError:
             return asyncio.run(self.ask_cortex_async(user_prompt, history, system_prompt, user_name))
             
-        import concurrent.futures
-        with concurrent.futures.ThreadPoolExecutor() as pool:
-            return pool.submit(asyncio.run, self.ask_cortex_async(user_prompt, history, system_prompt, user_name)).result()
+        return CORTEX_POOL.submit(asyncio.run, self.ask_cortex_async(user_prompt, history, system_prompt, user_name)).result()
 
     async def ask_cortex_direct_async(self, user_prompt: str, system_prompt: str = None) -> str:
         """
@@ -111,17 +178,17 @@ class ModelOrchestrator:
         Used for system jobs like Mid-Week Review.
         """
         try:
-            from litellm import completion
+            from litellm import acompletion
             model = os.getenv("CORTEX_MODEL", "gpt-4o")
             messages = []
             if system_prompt:
                 messages.append({"role": "system", "content": system_prompt})
             messages.append({"role": "user", "content": user_prompt})
             
-            response = completion(model=model, messages=messages, temperature=0.5)
+            response = await acompletion(model=model, messages=messages, temperature=0.5)
             return response.choices[0].message.content
         except Exception as e:
-            print(f"🔥 DIRECT LLM ERROR: {e}")
+            logger.exception("🔥 DIRECT LLM ERROR: %s", e)
             return f"System Error: {e}"
 
     def ask_cortex_direct(self, user_prompt: str, system_prompt: str = None) -> str:
@@ -130,16 +197,13 @@ class ModelOrchestrator:
         except RuntimeError:
             return asyncio.run(self.ask_cortex_direct_async(user_prompt, system_prompt))
             
-        import concurrent.futures
-        with concurrent.futures.ThreadPoolExecutor() as pool:
-            return pool.submit(asyncio.run, self.ask_cortex_direct_async(user_prompt, system_prompt)).result()
+        return CORTEX_POOL.submit(asyncio.run, self.ask_cortex_direct_async(user_prompt, system_prompt)).result()
 
     def ask_watchdog(self, context_to_evaluate: str) -> bool:
         """
         Uses the local Watchdog model (e.g. Ollama) directly.
         Bypasses the swarm since it's just a binary heartbeat check.
         """
-        from litellm import completion
         watchdog_model = os.getenv("WATCHDOG_MODEL", "gpt-4o") # fallback to 4o if ollama not active
         system_prompt = "You are a watchdog evaluating system state. Reply EXPLICITLY with 'YES' if action is required, or 'NO' if nominal."
         messages = [
@@ -147,10 +211,10 @@ class ModelOrchestrator:
             {"role": "user", "content": context_to_evaluate}
         ]
         try:
-            response = completion(model=watchdog_model, messages=messages, temperature=0.1)
-            return "YES" in response.choices[0].message.content.upper()
+            reply = self._cached_completion(watchdog_model, messages, temperature=0.1)
+            return bool(_YES_RE.search(reply))
         except Exception as e:
-            print(f"Watchdog error: {e}")
+            logger.exception("Watchdog error with model %s: %s", watchdog_model, e)
             return False
 
 router = ModelOrchestrator()
@@ -52,9 +52,7 @@ async def perform_midweek_review():
     user_prompt = f"CEO MÅL:\n{ceo_goals}\n\nVECKANS TILLSTÅND (REALITY):\n{reality_context}"
 
     try:
-        import asyncio
-        review_text = await asyncio.to_thread(
-            router.ask_cortex_direct,
+        review_text = await router.ask_cortex_direct_async(
             user_prompt=user_prompt,
             system_prompt=system_prompt
         )
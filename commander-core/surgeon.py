@@ -1,6 +1,72 @@
+import os
+import re
+import time
+import signal
+import logging
+import threading
 import subprocess
+import collections
 from io_jail import write_file, read_file
 
+logger = logging.getLogger(__name__)
+
+# First fenced markdown block (optional language tag); both fences must start a line,
+# so a ``` inside the code (e.g. s = '```') does not end the block
+_FENCE_RE = re.compile(r"^```[^\n]*\n(.*?)\n?^```", re.DOTALL | re.MULTILINE)
+# Opening fence alone, for replies truncated before the closing fence
+_FENCE_OPEN_RE = re.compile(r"^```[^\n]*(?:\n|$)", re.MULTILINE)
+
+# Only the tail of a failing command's output is passed back to Muscle for correction
+ERROR_TAIL_CHARS = 4096
+
+def _kill_group(proc: subprocess.Popen) -> None:
+    """SIGKILLs the command and everything it spawned (it runs as the leader of its own session)."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+def _run_with_tail(command: list[str], timeout: int) -> tuple[int, str]:
+    """
+    Runs `command` streaming its combined stdout/stderr, keeping only the last ERROR_TAIL_CHARS.
+    Raises subprocess.TimeoutExpired if the command, or any process it started, still holds
+    the output pipe after `timeout` seconds; the whole process group is killed in that case.
+    """
+    deadline = time.monotonic() + timeout
+    proc = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+        bufsize=1,
+        start_new_session=True,  # Own process group, so a timeout also reaches grandchildren (npm, sh -c, ...)
+        shell=False  # ZERO-TRUST: Mandatory False
+    )
+    tail = collections.deque(maxlen=256)  # Bounded line buffer; chatty builds never accumulate in memory
+
+    def _drain():
+        for line in proc.stdout:
+            tail.append(line)
+
+    # Read on a side thread so the deadline holds even while grandchildren keep the pipe open
+    reader = threading.Thread(target=_drain, daemon=True)
+    reader.start()
+    try:
+        proc.wait(timeout=timeout)
+        reader.join(max(0.0, deadline - time.monotonic()))
+        if reader.is_alive():
+            raise subprocess.TimeoutExpired(command, timeout)
+    except BaseException:
+        _kill_group(proc)
+        proc.wait()
+        raise
+    finally:
+        reader.join(1)
+        proc.stdout.close()
+
+    return proc.returncode, "".join(tail)[-ERROR_TAIL_CHARS:]
+
 class Surgeon:
     """
     Action Gateway taking directives from the Cortex Router and implementing them using
@@ -26,26 +92,19 @@ class Surgeon:
                 code_context=original_code
             )
             
-            # Very basic extraction (Muscle is prompted to output strictly code)
-            # A real implementation would parse markdown fences if the model disobeys
-            if "```" in new_code:
-                lines = new_code.split('\n')
-                code_lines = []
-                in_block = False
-                for line in lines:
-                    if line.startswith('```'):
-                        in_block = not in_block
-                        continue
-                    if in_block:
-                        code_lines.append(line)
-                new_code = '\n'.join(code_lines)
+            # Muscle is prompted to output strictly code; strip markdown fences if the model disobeys
+            m = _FENCE_RE.search(new_code)
+            if m:
+                new_code = m.group(1)
+            elif m := _FENCE_OPEN_RE.search(new_code):
+                new_code = new_code[m.end():]
             
             # Write back via the IO Jail ensuring zero-trust boundary
             write_file(filepath, new_code)
             return True
             
         except Exception as e:
-            print(f"Surgeon failed to refactor {filepath}: {e}")
+            logger.error("Surgeon failed to refactor %s: %s", filepath, e)
             return False
 
     def validate_code(self, filepath: str, command: list[str]) -> bool:
@@ -57,20 +116,13 @@ class Surgeon:
         while retries < self.max_retries:
             try:
                 # `command` must be a list of explicit args, e.g. ['pytest', 'tests/test_file.py']
-                result = subprocess.run(
-                    command,
-                    capture_output=True,
-                    text=True,
-                    timeout=30,  # 30 second hard cap
-                    shell=False  # ZERO-TRUST: Mandatory False
-                )
+                returncode, error_log = _run_with_tail(command, timeout=30)  # 30 second hard cap
                 
-                if result.returncode == 0:
+                if returncode == 0:
                     return True
                 else:
                     # Self-correction loop
-                    error_log = result.stderr or result.stdout
-                    print(f"Validation failed (Attempt {retries+1}). Passing to Muscle for correction...")
+                    logger.warning("Validation failed (Attempt %d). Passing to Muscle for correction...", retries + 1)
                     
                     prompt = f"The following code failed validation via command `{' '.join(command)}`:\n\nError Log:\n{error_log}\n\nFix it."
                     self.refactor_file(filepath, prompt)
@@ -78,10 +130,10 @@ class Surgeon:
                     retries += 1
                     
             except subprocess.TimeoutExpired:
-                print("Validation command timed out.")
+                logger.error("Validation command timed out.")
                 break
             except Exception as e:
-                print(f"Validation execution failed: {e}")
+                logger.error("Validation execution failed: %s", e)
                 break
                 
         return False
@@ -1,5 +1,6 @@
 import os
 import yaml
+import asyncio
 import logging
 from datetime import datetime
 from langchain_openai import ChatOpenAI
@@ -47,8 +48,11 @@ class ProactiveController:
 
     async def deduce_next_task(self) -> str:
         """Uses Cortex to deduce the next logical research step without human prompt."""
-        ceo_context = self.get_ceo_context()
-        activity = self.get_recent_activity()
+        # Both reads block (file IO + GitHub API); run them side by side off the event loop
+        ceo_context, activity = await asyncio.gather(
+            asyncio.to_thread(self.get_ceo_context),
+            asyncio.to_thread(self.get_recent_activity),
+        )
 
         knowledge_payload = f"CEO PROFILE:\n{ceo_context}\n\nRECENT 24H ACTIVITY:\n{activity}"
         